@@ -4,6 +4,7 @@
 from graphe import *
 from argparse import *
 from copy import deepcopy
+from heapq import heappush, heappop
 from os import listdir
 from os.path import isfile
 
@@ -13,6 +14,7 @@ def charger_donnees(graphe, fichier):
 	Lève une exception et n'ajoute pas les données si le fichier est syntaxiquement incorrect. """
 	sommets = set()
 	aretes = set()
+	temps_trajets = set()
 
 	with open(fichier, 'r') as donnees:
 		try:
@@ -25,11 +27,14 @@ def charger_donnees(graphe, fichier):
 			for connexion in connexions.split('\n')[:-1]:
 				u, v, temps = connexion.split('/')
 				aretes.add((int(u), int(v), fichier.rsplit(".txt")[0]))
+				temps_trajets.add((int(u), int(v), int(temps)))
 		except ValueError:
 			raise Exception("Le fichier de données '" + fichier + "' est syntaxiquement incorrect.")
 		else:
 			graphe.ajouter_sommets(sommets)
 			graphe.ajouter_aretes(aretes)
+			for u, v, temps in temps_trajets:
+				graphe.fixer_temps(u, v, temps)
 
 def numerotation(reseau):
 	""" Calcule et renvoie les listes correspondant aux dates de début d'exploration (basé sur un parcours en profondeur),
@@ -275,6 +280,282 @@ def amelioration_points_articulation(reseau):
 
 	return aretes_a_rajouter
 
+"""
+Améliorations selon les temps de trajet : on cherche à minimiser le temps de trajet total des arêtes rajoutées, le temps
+d'une arête étant celui du plus court chemin qu'elle double dans le réseau. Comme dans la version arbitraire, on relie
+les feuilles d'un arbre (celui des composantes sans pont, ou celui des blocs et des points d'articulation), mais on
+apparie toutes les feuilles à la fois avec ⌈L/2⌉ arêtes pour L feuilles. Les temps entre feuilles sont obtenus par un
+parcours de Dijkstra par feuille, lancé simultanément depuis tous ses sommets.
+"""
+
+def temps_liaison(reseau, u, v, temps_par_defaut):
+	""" Renvoie le temps de trajet de la liaison {u, v}, ou `temps_par_defaut` s'il n'est pas connu. """
+	temps = reseau.temps_trajet(u, v)
+	return temps_par_defaut if temps == None else temps
+
+def dijkstra_multi_sources(reseau, sources, temps_par_defaut=1):
+	""" Lance un unique parcours de Dijkstra depuis tous les sommets de `sources` à la fois.
+	Renvoie deux dictionnaires associant à chaque sommet atteint la distance à la source la plus proche et cette source. """
+	distance = dict()
+	origine = dict()
+	tas = []
+
+	for i, source in enumerate(sorted(sources)):
+		heappush(tas, (0, i, source, source))
+	compteur = len(tas) # Départage les égalités sans comparer les sommets entre eux.
+
+	while len(tas) > 0:
+		d, _, sommet, source = heappop(tas)
+		if sommet in distance:
+			continue
+		distance[sommet] = d
+		origine[sommet] = source
+
+		for voisin, ligne in reseau.voisins(sommet):
+			if voisin not in distance:
+				heappush(tas, (d + temps_liaison(reseau, sommet, voisin, temps_par_defaut), compteur, voisin, source))
+				compteur += 1
+
+	return distance, origine
+
+def composantes_sans_ponts(reseau, lst_ponts):
+	""" Renvoie un dictionnaire associant à chaque sommet du réseau l'indice de sa composante sans pont. """
+	composante = dict()
+	indice = -1
+
+	for racine in sorted(reseau.sommets()):
+		if racine not in composante:
+			indice += 1
+			composante[racine] = indice
+			pile = [racine]
+			while len(pile) > 0:
+				s = pile.pop()
+				for voisin, ligne in reseau.voisins(s):
+					if voisin not in composante and (s, voisin) not in lst_ponts and (voisin, s) not in lst_ponts:
+						composante[voisin] = indice
+						pile.append(voisin)
+
+	return composante
+
+def blocs(reseau):
+	""" Renvoie la liste des composantes 2-connexes (blocs) du réseau, chacune sous la forme d'un ensemble de sommets.
+	Chaque arête de l'arbre de parcours appartient au bloc de l'arête qui la précède, sauf si son extrémité ne remonte
+	pas au-dessus de son parent, auquel cas elle ouvre un nouveau bloc. """
+	sommets = sorted(reseau.sommets())
+	indice = {sommet: i for i, sommet in enumerate(sommets)}
+	debut, parent, ancetre = numerotation(reseau)
+	lst_blocs = []
+	bloc = dict() # Indice du bloc contenant l'arête d'arbre (parent[v], v).
+
+	for v in sorted(sommets, key=lambda sommet: debut[indice[sommet]]):
+		p = parent[indice[v]]
+		if p == None:
+			continue
+		if ancetre[indice[v]] >= debut[indice[p]]:
+			bloc[v] = len(lst_blocs)
+			lst_blocs.append({p})
+		else:
+			bloc[v] = bloc[p]
+		lst_blocs[bloc[v]].add(v)
+
+	return lst_blocs
+
+def parcours_arbre(arbre):
+	""" Parcourt en profondeur chaque composante de l'arbre (ou de la forêt) donné. Renvoie le dictionnaire des pères,
+	celui des profondeurs, et pour chaque composante la liste de ses feuilles dans l'ordre du parcours. """
+	parent = dict()
+	profondeur = dict()
+	composantes = []
+
+	for racine in sorted(arbre.sommets()):
+		if racine in parent:
+			continue
+		parent[racine] = None
+		profondeur[racine] = 0
+		feuilles = []
+		pile = [racine]
+		while len(pile) > 0:
+			s = pile.pop()
+			if arbre.degre(s) <= 1:
+				feuilles.append(s)
+			for voisin in sorted((voisin for voisin, ligne in arbre.voisins(s)), reverse=True):
+				if voisin not in parent:
+					parent[voisin] = s
+					profondeur[voisin] = profondeur[s] + 1
+					pile.append(voisin)
+		composantes.append(feuilles)
+
+	return parent, profondeur, composantes
+
+def chemin_arbre(parent, profondeur, a, b):
+	""" Renvoie la liste des sommets du chemin de `a` à `b` dans l'arbre décrit par `parent` et `profondeur`. """
+	debut, fin = [a], [b]
+
+	while a != b:
+		if profondeur[a] >= profondeur[b]:
+			a = parent[a]
+			debut.append(a)
+		else:
+			b = parent[b]
+			fin.append(b)
+
+	return debut + fin[-2::-1]
+
+def temps_entre_feuilles(reseau, feuilles, temps_par_defaut=1):
+	""" `feuilles` associe à chaque feuille l'ensemble des sommets du réseau par lesquels on peut la relier. Renvoie un
+	dictionnaire associant à chaque couple de feuilles (A, B) reliées dans le réseau un triplet (temps, a, b), où a et b
+	sont les sommets de A et de B les plus proches. Un seul parcours de Dijkstra est lancé par feuille. """
+	liaisons = dict()
+
+	for A in feuilles:
+		distance, origine = dijkstra_multi_sources(reseau, feuilles[A], temps_par_defaut)
+		for B in feuilles:
+			atteints = [b for b in sorted(feuilles[B]) if b in distance]
+			if B != A and len(atteints) > 0:
+				b = min(atteints, key=lambda sommet: distance[sommet])
+				liaisons[(A, B)] = (distance[b], origine[b], b)
+
+	return liaisons
+
+def apparier_feuilles(feuilles, liaisons, defauts):
+	""" Apparie les L feuilles données, dans l'ordre d'un parcours en profondeur de leur arbre, avec ⌈L/2⌉ paires, en
+	cherchant d'abord à minimiser `defauts(paires)`, puis le temps total donné par `liaisons`. Deux appariements de départ
+	sont améliorés en échangeant les extrémités de deux paires : celui de chaque feuille avec celle située L/2 rangs plus
+	loin, dont les chemins passent par toutes les arêtes de l'arbre, et celui qui relie d'abord les feuilles les plus
+	proches. On garde le meilleur des deux. """
+	moitie = len(feuilles) // 2
+	depart_parcours = [(feuilles[i], feuilles[i + moitie]) for i in range((len(feuilles) + 1) // 2)]
+
+	depart_proches = []
+	restantes = set(feuilles)
+	for A, B in sorted(((A, B) for A in feuilles for B in feuilles if (A, B) in liaisons), key=lambda paire: liaisons[paire][0]):
+		if A in restantes and B in restantes:
+			depart_proches.append((A, B))
+			restantes -= {A, B}
+	if len(restantes) > 0: # Nombre impair de feuilles : la dernière est reliée à la plus proche.
+		A = restantes.pop()
+		depart_proches.append(min(((A, B) for B in feuilles if B != A), key=lambda paire: liaisons[paire][0]))
+
+	def evaluer(paires):
+		return defauts(paires), sum(liaisons[paire][0] for paire in paires)
+
+	meilleur = None
+	for paires in (depart_parcours, depart_proches):
+		courant = evaluer(paires)
+		ameliore = True
+		while ameliore:
+			ameliore = False
+			for i in range(len(paires)):
+				for j in range(i + 1, len(paires)):
+					(a, b), (c, d) = paires[i], paires[j]
+					for p, q in (((a, c), (b, d)), ((a, d), (b, c))):
+						if p[0] == p[1] or q[0] == q[1]:
+							continue
+						essai = paires[:i] + [p] + paires[i+1:j] + [q] + paires[j+1:]
+						valeur = evaluer(essai)
+						if valeur < courant:
+							paires, courant, ameliore = essai, valeur, True
+							break
+		if meilleur == None or courant < meilleur[0]:
+			meilleur = (courant, paires)
+
+	return meilleur[1]
+
+def relier_feuilles(reseau, arbre, candidats, defauts, temps_par_defaut=1):
+	""" Rajoute au réseau, pour chaque composante de l'arbre donné, les arêtes reliant ses feuilles deux à deux choisies par
+	apparier_feuilles(). `candidats` associe à chaque feuille les sommets du réseau par lesquels on peut la relier, et
+	`defauts(chemins)` compte ce qui resterait à corriger si l'on reliait des feuilles le long des chemins donnés de
+	l'arbre. Renvoie l'ensemble des arêtes rajoutées. """
+	parent, profondeur, composantes = parcours_arbre(arbre)
+	composantes = [feuilles for feuilles in composantes if len(feuilles) >= 2]
+	liaisons = temps_entre_feuilles(reseau, {f: candidats[f] for feuilles in composantes for f in feuilles}, temps_par_defaut)
+	aretes_a_rajouter = set()
+
+	def defauts_paires(paires):
+		return defauts([chemin_arbre(parent, profondeur, a, b) for a, b in paires])
+
+	for feuilles in composantes:
+		for A, B in apparier_feuilles(feuilles, liaisons, defauts_paires):
+			temps, u, v = liaisons[(A, B)]
+			reseau.ajouter_arete(u, v, None)
+			reseau.fixer_temps(u, v, temps)
+			aretes_a_rajouter.add((u, v))
+
+	return aretes_a_rajouter
+
+def amelioration_ponts_temps(reseau, temps_par_defaut=1):
+	""" Renvoie l'ensemble des arêtes à rajouter au réseau pour supprimer ses ponts, en cherchant à minimiser leur temps de
+	trajet total. Les L feuilles de l'arbre des composantes sans pont sont reliées par ⌈L/2⌉ arêtes, chaque pont devant
+	être doublé par l'une d'elles. Les liaisons dont le temps n'est pas connu valent `temps_par_defaut`. """
+	aretes_a_rajouter = set()
+	copie_reseau = deepcopy(reseau)
+	lst_ponts = ponts(copie_reseau)
+
+	while len(lst_ponts) > 0:
+		composante = composantes_sans_ponts(copie_reseau, lst_ponts)
+		arbre = Graphe()
+		for u, v in lst_ponts:
+			arbre.ajouter_arete(composante[u], composante[v], None)
+
+		candidats = {c: set() for c in arbre.sommets()}
+		for sommet, c in composante.items():
+			if c in candidats:
+				candidats[c].add(sommet)
+
+		def ponts_restants(chemins):
+			""" Nombre de ponts qui ne sont sur aucun des chemins. """
+			doubles = {frozenset(chemin[k:k+2]) for chemin in chemins for k in range(len(chemin) - 1)}
+			return arbre.nombre_aretes() - len(doubles)
+
+		aretes_a_rajouter |= relier_feuilles(copie_reseau, arbre, candidats, ponts_restants, temps_par_defaut)
+		lst_ponts = ponts(copie_reseau)
+
+	return aretes_a_rajouter
+
+def amelioration_points_articulation_temps(reseau, temps_par_defaut=1):
+	""" Renvoie l'ensemble des arêtes à rajouter au réseau pour supprimer ses points d'articulation, en cherchant à minimiser
+	leur temps de trajet total. Les L blocs feuilles de l'arbre des blocs et des points d'articulation sont reliés par ⌈L/2⌉
+	arêtes (par des sommets qui ne sont pas des points d'articulation); s'il reste des points d'articulation, on
+	recommence. Les liaisons dont le temps n'est pas connu valent `temps_par_defaut`. """
+	aretes_a_rajouter = set()
+	copie_reseau = deepcopy(reseau)
+	articulations = points_articulation(copie_reseau)
+
+	while len(articulations) > 0:
+		# Chaque bloc contenant un point d'articulation est relié à celui-ci dans l'arbre.
+		arbre = Graphe()
+		candidats = dict()
+		for i, bloc in enumerate(blocs(copie_reseau)):
+			candidats[("bloc", i)] = bloc - articulations
+			for point in bloc & articulations:
+				arbre.ajouter_arete(("bloc", i), ("point", point), None)
+
+		def separations_restantes(chemins):
+			""" Pour chaque point d'articulation, nombre de ses branches dans l'arbre qui resteraient séparées en reliant
+			les extrémités des chemins, sommé sur tous les points d'articulation. """
+			representant = dict()
+
+			def trouver(branche):
+				while representant.get(branche, branche) != branche:
+					branche = representant[branche]
+				return branche
+
+			fusions = 0
+			for chemin in chemins:
+				for k in range(1, len(chemin) - 1):
+					if chemin[k][0] == "point":
+						r1, r2 = trouver((chemin[k], chemin[k-1])), trouver((chemin[k], chemin[k+1]))
+						if r1 != r2:
+							representant[r1] = r2
+							fusions += 1
+
+			return sum(arbre.degre(("point", point)) - 1 for point in articulations) - fusions
+
+		aretes_a_rajouter |= relier_feuilles(copie_reseau, arbre, candidats, separations_restantes, temps_par_defaut)
+		articulations = points_articulation(copie_reseau)
+
+	return aretes_a_rajouter
+
 def chercher_fichiers(prefixe, suffixe):
 	""" Renvoie la liste de tous les fichiers commençant par `préfixe` et finissant par `suffixe` dans le répertoire courant. """
 	fichiers = []
@@ -325,13 +606,54 @@ def charger_lignes(reseau, lignes_metro, lignes_rer):
 
 	print("Le réseau contient", reseau.nombre_sommets(), "sommets et", reseau.nombre_aretes(), "arêtes.")
 
+def station_ambigue(reseau, saisie, candidats, limite=5):
+	""" Renvoie l'exception signalant que `saisie` désigne plusieurs stations, en citant au plus `limite` des candidats
+	donnés, suivis de '...' s'il y en a d'autres. """
+	noms = ", ".join(reseau.nom_sommet(candidat) for candidat in candidats[:limite])
+	return ValueError("station '" + saisie + "' ambiguë (" + noms + ("..." if len(candidats) > limite else "") + ").")
+
+def trouver_station(reseau, saisie, distance_max=2):
+	""" Renvoie l'identifiant de la station désignée par `saisie`, qui peut être un identifiant, un nom (sans tenir compte
+	des accents ni de la casse), le début d'un seul nom, ou un nom mal orthographié d'au plus `distance_max` fautes.
+	Lève une exception si aucune station ne correspond ou si plusieurs correspondent. """
+	if saisie.isdigit() and reseau.contient_sommet(int(saisie)):
+		return int(saisie)
+	if normaliser_nom(saisie) == "": # Sinon tous les noms commenceraient par la saisie.
+		raise ValueError("station '" + saisie + "' introuvable.")
+
+	# On demande un candidat de plus que ceux affichés pour savoir s'il en reste d'autres.
+	for candidats in (sorted(reseau.sommets_nommes(saisie)), reseau.index_noms.completer(saisie, 6)):
+		if len(candidats) == 1:
+			return candidats[0]
+		elif len(candidats) > 1:
+			raise station_ambigue(reseau, saisie, candidats)
+
+	approches = reseau.index_noms.rechercher_approche(saisie, distance_max)
+	if len(approches) == 1 or (len(approches) > 1 and approches[0][0] < approches[1][0]):
+		return approches[0][1]
+	elif len(approches) > 1:
+		raise station_ambigue(reseau, saisie, [s for d, s in approches])
+
+	raise ValueError("station '" + saisie + "' introuvable.")
+
 def afficher_stations(reseau):
 	""" Affiche la liste des stations constituant le réseau sous la forme 'nom (id)' dans l'ordre alphabétique. """
 	print("\nLe réseau contient les", reseau.nombre_sommets(), "stations suivantes :")
 
-	for station in sorted(reseau.sommets(), key=reseau.nom_sommet):
+	for station in reseau.index_noms.parcourir():
 		print(reseau.nom_sommet(station), '(' + str(station) + ')')
 
+def afficher_stations_recherchees(reseau, saisies):
+	""" Affiche, pour chaque nom ou identifiant donné, la station correspondante sous la forme 'nom (id)'. """
+	print()
+	for saisie in saisies:
+		try:
+			station = trouver_station(reseau, saisie)
+		except ValueError as erreur:
+			print("Erreur :", erreur)
+		else:
+			print(saisie, "->", reseau.nom_sommet(station), '(' + str(station) + ')')
+
 def afficher_ponts(reseau):
 	""" Affiche la liste des ponts du réseau dans l'ordre alphabétique de la première extrémitée du pont. """
 	lst_ponts = ponts(reseau)
@@ -351,9 +673,13 @@ def afficher_points_articulations(reseau):
 	for i, point in enumerate(sorted(lst_points, key=reseau.nom_sommet)):
 		print("\t" + str(i+1) + ":", reseau.nom_sommet(point))
 
-def afficher_ameliorations_points_articulations(reseau):
-	""" Affiche la liste des arêtes à rajouter au réseau pour supprimer ses points d'articulations dans l'ordre alphabétique de la première extrémitée. """
-	lst_ameliorations = amelioration_points_articulation(reseau)
+def afficher_ameliorations_points_articulations(reseau, selon_temps=False):
+	""" Affiche la liste des arêtes à rajouter au réseau pour supprimer ses points d'articulations dans l'ordre alphabétique de la première extrémitée.
+	Si `selon_temps` vaut True, les arêtes sont choisies pour réduire le temps de trajet total rajouté. """
+	if selon_temps:
+		lst_ameliorations = amelioration_points_articulation_temps(reseau)
+	else:
+		lst_ameliorations = amelioration_points_articulation(reseau)
 
 	print("\nOn peut éliminer tous les points d'articulations du réseau en rajoutant les", len(lst_ameliorations), "arêtes suivantes :")
 
@@ -361,9 +687,13 @@ def afficher_ameliorations_points_articulations(reseau):
 		u, v = sorted((reseau.nom_sommet(u), reseau.nom_sommet(v)))
 		print('\t-', u, '--', v)
 
-def afficher_ameliorations_ponts(reseau):
-	""" Affiche la liste des arêtes à rajouter au réseau pour supprimer ses ponts dans l'ordre alphabétique de la première extrémitée. """
-	lst_ameliorations = amelioration_ponts(reseau)
+def afficher_ameliorations_ponts(reseau, selon_temps=False):
+	""" Affiche la liste des arêtes à rajouter au réseau pour supprimer ses ponts dans l'ordre alphabétique de la première extrémitée.
+	Si `selon_temps` vaut True, les arêtes sont choisies pour réduire le temps de trajet total rajouté. """
+	if selon_temps:
+		lst_ameliorations = amelioration_ponts_temps(reseau)
+	else:
+		lst_ameliorations = amelioration_ponts(reseau)
 
 	print("\nOn peut éliminer tous les ponts du réseau en rajoutant les", len(lst_ameliorations), "arêtes suivantes :")
 
@@ -381,10 +711,12 @@ def main():
 	parser.add_argument("--metro", help="Précise les lignes de métro à charger. Si rien n'est spécifié, alors toutes les lignes de métro dans le répertoire courant sont chargées.", type=str, metavar="lignes", nargs='*', default=None)
 	parser.add_argument("--rer", help="Précise les lignes de RER à charger. Si rien n'est spécifié, alors toutes les lignes de RER dans le répertoire courant sont chargées.", type=str, metavar="lignes", nargs='*', default=None)
 	parser.add_argument("--liste-stations", help="Affiche la liste des stations du réseau avec leur identifiant triées par ordre alphabétique.", action="store_true")
+	parser.add_argument("--station", help="Affiche les stations désignées par leur identifiant ou leur nom. Un nom peut être incomplet, sans accents ou mal orthographié.", type=str, metavar="stations", nargs='+')
 	parser.add_argument("--articulations", help="Affiche les points d’articulation du réseau qui a été chargé.", action="store_true")
 	parser.add_argument("--ponts", help="Affiche les ponts du réseau qui a été chargé.", action="store_true")
 	parser.add_argument("--ameliorer-articulations", help="Affiche les points d’articulation du réseau qui a été chargé, ainsi que les arêtes à rajouter pour que ces stations ne soient plus des points d’articulation.", action="store_true")
 	parser.add_argument("--ameliorer-ponts", help="Affiche les ponts du réseau qui a été chargé, ainsi que les arêtes à rajouter pour que ces arêtes ne soient plus des ponts.", action="store_true")
+	parser.add_argument("--selon-temps", help="Avec --ameliorer-articulations ou --ameliorer-ponts, choisit les arêtes à rajouter de façon à réduire le temps de trajet total rajouté, en reliant les feuilles deux à deux comme le choix par défaut.", action="store_true")
 
 	args = parser.parse_args()
 
@@ -392,14 +724,16 @@ def main():
 
 	if args.liste_stations:
 		afficher_stations(reseau)
+	if args.station:
+		afficher_stations_recherchees(reseau, args.station)
 	if args.ponts:
 		afficher_ponts(reseau)
 	if args.articulations:
 		afficher_points_articulations(reseau)
 	if args.ameliorer_articulations:
-		afficher_ameliorations_points_articulations(reseau)
+		afficher_ameliorations_points_articulations(reseau, args.selon_temps)
 	if args.ameliorer_ponts:
-		afficher_ameliorations_ponts(reseau)
+		afficher_ameliorations_ponts(reseau, args.selon_temps)
 
 if __name__ == '__main__':
 	main()
\ No newline at end of file
@@ -3,14 +3,129 @@
 """Implémentation d'un graphe non orienté et orienté représentant un réseau à l'aide d'un dictionnaire:
 les clés sont les sommets, et les valeurs sont des tuples composés du sommet successeur et de la ligne
 auquelle les deux sommets sont reliés. Les boucles sont autorisées et les aretes parallèles aussi.
+Les noms des sommets sont indexés dans un arbre préfixe permettant de retrouver un sommet à partir de son nom.
 """
 
+from unicodedata import category, normalize
+
+
+def normaliser_nom(nom):
+    """Renvoie le nom en minuscules, sans accents, et dont la ponctuation est
+    remplacée par des espaces (ex: "Champs-Elysées" -> "champs elysees")."""
+    nom = "".join(c for c in normalize("NFKD", nom) if category(c) != "Mn").casefold()
+    return " ".join("".join(c if c.isalnum() else " " for c in nom).split())
+
+
+class NoeudTrie(object):
+    def __init__(self):
+        """Initialise un noeud sans enfants ni sommets."""
+        self.enfants = dict() # Associe à chaque caractère le noeud suivant.
+        self.sommets = set() # Sommets dont le nom normalisé se termine sur ce noeud.
+
+
+class IndexNoms(object):
+    """Arbre préfixe des noms normalisés des sommets, permettant la recherche
+    exacte, la complétion d'un préfixe et la recherche approchée."""
+
+    def __init__(self):
+        """Initialise un index vide."""
+        self.racine = NoeudTrie()
+
+    def ajouter(self, sommet, nom):
+        """Indexe le sommet sous le nom donné."""
+        noeud = self.racine
+        for c in normaliser_nom(nom):
+            if c not in noeud.enfants:
+                noeud.enfants[c] = NoeudTrie()
+            noeud = noeud.enfants[c]
+        noeud.sommets.add(sommet)
+
+    def retirer(self, sommet, nom):
+        """Retire le sommet indexé sous le nom donné, s'il existe."""
+        chemin = [self.racine]
+        nom = normaliser_nom(nom)
+        for c in nom:
+            if c not in chemin[-1].enfants:
+                return
+            chemin.append(chemin[-1].enfants[c])
+        chemin[-1].sommets.discard(sommet)
+
+        # On élague les noeuds devenus inutiles en remontant vers la racine.
+        for i in range(len(nom), 0, -1):
+            if chemin[i].sommets or chemin[i].enfants:
+                break
+            del chemin[i - 1].enfants[nom[i - 1]]
+
+    def noeud(self, prefixe):
+        """Renvoie le noeud atteint en lisant le préfixe normalisé, ou None."""
+        noeud = self.racine
+        for c in normaliser_nom(prefixe):
+            if c not in noeud.enfants:
+                return None
+            noeud = noeud.enfants[c]
+        return noeud
+
+    def rechercher(self, nom):
+        """Renvoie l'ensemble des sommets dont le nom normalisé est celui donné."""
+        noeud = self.noeud(nom)
+        return set() if noeud == None else set(noeud.sommets)
+
+    def parcourir(self, noeud=None, limite=None):
+        """Renvoie la liste des sommets sous le noeud donné (la racine par
+        défaut), dans l'ordre alphabétique de leur nom normalisé. Le parcours
+        s'arrête dès que `limite` sommets ont été trouvés."""
+        sommets = []
+        pile = [self.racine if noeud == None else noeud]
+        while pile and (limite == None or len(sommets) < limite):
+            noeud = pile.pop()
+            sommets.extend(sorted(noeud.sommets, key=str))
+            pile.extend(noeud.enfants[c] for c in sorted(noeud.enfants, reverse=True))
+        return sommets[:limite]
+
+    def completer(self, prefixe, limite=None):
+        """Renvoie au plus `limite` sommets dont le nom normalisé commence par
+        le préfixe donné, dans l'ordre alphabétique."""
+        noeud = self.noeud(prefixe)
+        if noeud == None:
+            return []
+        return self.parcourir(noeud, limite)
+
+    def rechercher_approche(self, nom, distance_max=2):
+        """Renvoie la liste des couples (distance, sommet) tels que la distance
+        d'édition entre le nom normalisé du sommet et celui donné soit au plus
+        `distance_max`, triée par distance croissante. Les branches de l'arbre
+        dont toutes les distances dépassent la borne ne sont pas explorées."""
+        nom = normaliser_nom(nom)
+        resultats = []
+        # Chaque élément de la pile contient un noeud et la ligne de la matrice
+        # de Levenshtein correspondant au préfixe qui y mène.
+        pile = [(self.racine, list(range(len(nom) + 1)))]
+
+        while pile:
+            noeud, ligne = pile.pop()
+            if ligne[-1] <= distance_max:
+                resultats.extend((ligne[-1], sommet) for sommet in noeud.sommets)
+            if min(ligne) > distance_max:
+                continue
+
+            for c, enfant in noeud.enfants.items():
+                nouvelle_ligne = [ligne[0] + 1]
+                for i in range(1, len(nom) + 1):
+                    nouvelle_ligne.append(min(nouvelle_ligne[i - 1] + 1, ligne[i] + 1,
+                                              ligne[i - 1] + (nom[i - 1] != c)))
+                pile.append((enfant, nouvelle_ligne))
+
+        return sorted(resultats, key=lambda resultat: (resultat[0], str(resultat[1])))
+
+
 
 class Graphe(object):
     def __init__(self):
         """Initialise un graphe sans arêtes"""
         self.dictionnaire = dict()
         self.noms = dict() # Permet la correspondance entre identifiant et nom de station.
+        self.index_noms = IndexNoms() # Permet la correspondance inverse, entre nom et identifiant.
+        self.temps = dict() # Temps de trajet (en secondes) associé à chaque paire de sommets reliés.
 
     def ajouter_arete(self, u, v, ligne):
         """Ajoute une arête entre les sommmets u et v, en créant les sommets
@@ -47,6 +162,8 @@ class Graphe(object):
         if not self.contient_sommet(sommet):        
             self.dictionnaire[sommet] = set()
             self.noms[sommet] = nom
+            if nom != None:
+                self.index_noms.ajouter(sommet, nom)
 
     def ajouter_sommets(self, iterable):
         """Ajoute tous les sommets de l'itérable donné au graphe. N'importe
@@ -122,6 +239,8 @@ class Graphe(object):
         for ligne in lignes:
             self.dictionnaire[v].remove((u, ligne))
 
+        self.temps.pop(frozenset((u, v)), None)
+
     def retirer_aretes(self, iterable):
         """Retire toutes les arêtes de l'itérable donné du graphe. N'importe
         quel type d'itérable est acceptable, mais il faut qu'il ne contienne
@@ -133,11 +252,16 @@ class Graphe(object):
         """Efface le sommet du graphe, et retire toutes les arêtes qui lui
         sont incidentes."""
         del self.dictionnaire[sommet]
+        if self.noms.get(sommet) != None:
+            self.index_noms.retirer(sommet, self.noms[sommet])
         # retirer le sommet des ensembles de voisins
         for u in self.dictionnaire:
             for v, ligne in self.dictionnaire[u]:
                 if v == sommet:
                     self.dictionnaire[u].discard((v, ligne))
+        # retirer les temps de trajet des arêtes incidentes
+        for paire in [paire for paire in self.temps if sommet in paire]:
+            del self.temps[paire]
 
     def retirer_sommets(self, iterable):
         """Efface les sommets de l'itérable donné du graphe, et retire toutes
@@ -176,6 +300,23 @@ class Graphe(object):
         """Renvoie le nom correspondant à l'identifiant du sommet donné. """
         return self.noms[sommet]
 
+    def sommets_nommes(self, nom):
+        """Renvoie l'ensemble des sommets portant le nom donné, sans tenir
+        compte des accents, de la casse et de la ponctuation."""
+        return self.index_noms.rechercher(nom)
+
+    def fixer_temps(self, u, v, temps):
+        """Associe le temps de trajet donné à la liaison {u, v}. Si plusieurs
+        temps sont donnés pour la même liaison, on conserve le plus court."""
+        paire = frozenset((u, v))
+        if paire not in self.temps or temps < self.temps[paire]:
+            self.temps[paire] = temps
+
+    def temps_trajet(self, u, v):
+        """Renvoie le temps de trajet de la liaison {u, v}, ou None s'il
+        n'est pas connu."""
+        return self.temps.get(frozenset((u, v)))
+
     def ajouter_arc(self, u, v, ligne):
         """Ajoute un arc entre les sommmets u et v, en créant les sommets
         manquants le cas échéant."""
@@ -301,6 +442,10 @@ def modifier_noms(graphe):
         for v, ligne in graphe.voisins(u):
             nouveau_graphe.ajouter_arc(correspondance[u], correspondance[v], ligne)
 
+    for paire, temps in graphe.temps.items():
+        u, v = tuple(paire) if len(paire) == 2 else tuple(paire) * 2 # Une boucle ne contient qu'un sommet.
+        nouveau_graphe.fixer_temps(correspondance[u], correspondance[v], temps)
+
     return nouveau_graphe
 
 def export_dot(graphe):
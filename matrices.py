@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Représentation d'un graphe sous forme de tableaux NumPy, pour calculer des statistiques sur
+l'ensemble du réseau sans boucle Python sur les sommets. Les sommets sont renumérotés de 0 à n-1
+dans le même ordre que modifier_noms(), et les arcs sont stockés au format CSR (lignes compressées).
+SciPy est utilisé s'il est installé; sinon les calculs se font uniquement avec NumPy.
+"""
+
+import numpy as np
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+except ImportError:
+    csr_matrix = connected_components = None
+
+
+class MatriceAdjacence(object):
+    def __init__(self, graphe, avec_poids=False):
+        """Construit la représentation du graphe donné. Chaque arête {u, v}
+        donne deux arcs (u, v) et (v, u), et chaque boucle un seul arc, comme
+        dans Graphe.dictionnaire. Si `avec_poids` vaut True, le temps de trajet
+        de chaque arc est conservé (NaN s'il n'est pas connu)."""
+        self.sommets = sorted(graphe.sommets()) # Identifiant d'origine de chaque indice.
+        self.indices = {sommet: i for i, sommet in enumerate(self.sommets)}
+        self.noms_lignes = sorted({ligne for u in self.sommets for v, ligne in graphe.voisins(u)}, key=str)
+        code_ligne = {ligne: i for i, ligne in enumerate(self.noms_lignes)}
+
+        # Les arcs sont triés par origine puis destination, ce qui donne directement le format CSR.
+        arcs = [(i, self.indices[v], code_ligne[ligne])
+                for i, u in enumerate(self.sommets)
+                for v, ligne in sorted(graphe.voisins(u), key=lambda voisin: (self.indices[voisin[0]], str(voisin[1])))]
+        arcs = np.array(arcs, dtype=np.int64).reshape(-1, 3)
+
+        self.origines = arcs[:, 0]
+        self.destinations = arcs[:, 1]
+        self.lignes = arcs[:, 2] # Code de la ligne de chaque arc (indice dans self.noms_lignes).
+        self.pointeurs = np.concatenate(([0], np.cumsum(np.bincount(self.origines, minlength=len(self.sommets)))))
+
+        self.poids = None
+        if avec_poids:
+            temps = [graphe.temps_trajet(self.sommets[i], self.sommets[j]) for i, j in zip(self.origines, self.destinations)]
+            self.poids = np.array([np.nan if t == None else t for t in temps], dtype=np.float64)
+
+    def nombre_sommets(self):
+        """Renvoie le nombre de sommets du graphe."""
+        return len(self.sommets)
+
+    def matrice(self):
+        """Renvoie la matrice d'adjacence au format scipy.sparse.csr_matrix, dont
+        les coefficients sont les poids s'ils ont été conservés, et 1 sinon. Les
+        arêtes parallèles restent des coefficients distincts. Lève une exception
+        si SciPy n'est pas installé."""
+        if csr_matrix == None:
+            raise ImportError("SciPy n'est pas installé.")
+
+        donnees = np.ones(len(self.destinations)) if self.poids is None else self.poids
+        n = self.nombre_sommets()
+        return csr_matrix((donnees, self.destinations, self.pointeurs), shape=(n, n))
+
+    def degres(self):
+        """Renvoie le tableau des degrés des sommets (Graphe.degre de chaque sommet)."""
+        return np.diff(self.pointeurs)
+
+    def nombre_aretes(self):
+        """Renvoie le nombre d'arêtes du graphe, calculé comme Graphe.nombre_aretes()."""
+        return len(self.origines) // 2
+
+    def nombre_boucles(self):
+        """Renvoie le nombre de sommets reliés à eux-mêmes, comme Graphe.nombre_boucles()."""
+        return np.unique(self.origines[self.origines == self.destinations]).size
+
+    def etiquettes_composantes(self):
+        """Renvoie un tableau associant à chaque sommet l'indice de sa composante
+        connexe, calculé par SciPy s'il est installé, et par
+        etiquettes_par_accrochage() sinon."""
+        if connected_components != None:
+            return connected_components(self.matrice(), directed=False)[1]
+
+        etiquettes, tours = etiquettes_par_accrochage(self.nombre_sommets(), self.origines, self.destinations)
+        return np.unique(etiquettes, return_inverse=True)[1]
+
+    def composantes_connexes(self):
+        """Renvoie un ensemble de tuples dont chaque tuple contient les sommets
+        (identifiants d'origine) d'une composante connexe du graphe."""
+        etiquettes = self.etiquettes_composantes()
+        ordre = np.argsort(etiquettes, kind="stable")
+        bornes = np.flatnonzero(np.diff(etiquettes[ordre])) + 1
+        return {tuple(self.sommets[i] for i in composante) for composante in np.split(ordre, bornes) if len(composante) > 0}
+
+    def nombre_composantes_connexes(self):
+        """Renvoie le nombre de composantes connexes du graphe."""
+        return len(np.unique(self.etiquettes_composantes()))
+
+
+def etiquettes_par_accrochage(n, origines, destinations):
+    """Calcule les composantes connexes du graphe à n sommets dont les arcs sont
+    donnés, en maintenant une forêt de pères : à chaque tour, la racine de
+    chaque extrémité d'arc est accrochée à la plus petite racine voisine, puis
+    chaque sommet est rattaché directement à sa racine. On s'arrête quand plus
+    aucune racine ne change. Renvoie le tableau des racines (la racine d'une
+    composante est son plus petit sommet) et le nombre de tours effectués."""
+    etiquettes = np.arange(n)
+    tours = 0
+    while True:
+        tours += 1
+        avant = etiquettes.copy()
+        np.minimum.at(etiquettes, avant[origines], avant[destinations])
+        np.minimum.at(etiquettes, avant[destinations], avant[origines])
+        while not np.array_equal(etiquettes[etiquettes], etiquettes):
+            etiquettes = etiquettes[etiquettes]
+        if np.array_equal(etiquettes, avant):
+            return etiquettes, tours
+
+
+def export_numpy(graphe, avec_poids=False):
+    """Renvoie la représentation MatriceAdjacence du graphe donné."""
+    return MatriceAdjacence(graphe, avec_poids)